@@ -6,7 +6,6 @@ from GS1 GPC data.
 
 import os
 import logging
-import xml.etree.ElementTree as ET
 from gs1_gpc.db import DatabaseConnection, setup_database
 from gs1_gpc.parser import GPCParser
 from gs1_gpc.downloader import GPCDownloader
@@ -71,48 +70,6 @@ class FoodSegmentFilter(GPCProcessedCallback):
         logging.info(f"Attribute Values: {self.stats['attribute_values']}")
 
 
-def filter_xml_for_food_segment(input_xml_path, output_xml_path):
-    """
-    Filter the XML file to include only the Food/Beverage segment.
-    
-    Args:
-        input_xml_path: Path to the original XML file
-        output_xml_path: Path to save the filtered XML file
-    
-    Returns:
-        bool: True if successful, False otherwise
-    """
-    try:
-        # Parse the XML file
-        tree = ET.parse(input_xml_path)
-        root = tree.getroot()
-        
-        # Find all segments
-        segments = root.findall(".//segment")
-        if not segments:
-            logging.error("No segments found in the XML file")
-            return False
-        
-        # Keep only the Food/Beverage segment
-        segments_to_remove = []
-        for segment in segments:
-            if segment.get("code") != FOOD_SEGMENT_CODE:
-                segments_to_remove.append(segment)
-        
-        # Remove non-food segments
-        for segment in segments_to_remove:
-            root.remove(segment)
-        
-        # Save the filtered XML
-        tree.write(output_xml_path)
-        logging.info(f"Filtered XML saved to {output_xml_path}")
-        return True
-    
-    except Exception as e:
-        logging.error(f"Error filtering XML: {e}")
-        return False
-
-
 def main():
     """Main function to demonstrate advanced import of Food/Beverage segment."""
     # Create a downloader instance
@@ -127,12 +84,6 @@ def main():
             logging.error("Failed to download GPC data")
             return
     
-    # Create a filtered XML file with only the Food/Beverage segment
-    filtered_xml_path = os.path.join(os.path.dirname(xml_file), "food_segment.xml")
-    if not filter_xml_for_food_segment(xml_file, filtered_xml_path):
-        logging.error("Failed to filter XML for Food/Beverage segment")
-        return
-    
     # Create database connection
     db_connection = DatabaseConnection(DB_FILE)
     
@@ -144,9 +95,9 @@ def main():
     # Create callback filter
     food_filter = FoodSegmentFilter()
     
-    # Create parser and process filtered XML file
-    parser = GPCParser(db_connection, callback=food_filter)
-    parser.process_xml(filtered_xml_path)
+    # Create parser restricted to the Food/Beverage segment and process the XML file
+    parser = GPCParser(db_connection, callback=food_filter, segment_codes=[FOOD_SEGMENT_CODE])
+    parser.process_xml(xml_file)
     
     # Close database connection
     db_connection.close()
@@ -23,6 +23,16 @@ GPC_DOWNLOAD_DIR = os.path.join(SCRIPT_DIR, 'data', 'imports')
 DEFAULT_FALLBACK_XML_FILE = os.path.join(GPC_DOWNLOAD_DIR, 'en-v20241202.xml')
 
 
+def _parse_segment_codes(ctx, param, value):
+    """Split a comma-separated list of segment codes, rejecting an empty list"""
+    if value is None:
+        return None
+    segment_codes = [code.strip() for code in value.split(',') if code.strip()]
+    if not segment_codes:
+        raise click.BadParameter('expected at least one segment code')
+    return segment_codes
+
+
 @click.group()
 @click.version_option(version=__version__)
 def cli():
@@ -39,10 +49,11 @@ def cli():
 @click.option('--download', is_flag=True, help='Download the latest GPC data before import')
 @click.option('--language', default='en', help='Language code for GPC data download (default: en)')
 @click.option('--download-dir', help='Directory where GPC files will be downloaded')
+@click.option('--include-segments', callback=_parse_segment_codes, help='Comma-separated segment codes to import (default: all segments)')
 @click.option('--dump-sql', is_flag=True, help='Dump database tables to SQL file after import')
 @click.option('--verbose', '-v', is_flag=True, help='Enable detailed debug logging')
 @click.option('--quiet', '-q', is_flag=True, help='Suppress all logging except errors')
-def import_gpc(xml_file, db_file, db_type, download, language, download_dir, dump_sql, verbose, quiet):
+def import_gpc(xml_file, db_file, db_type, download, language, download_dir, include_segments, dump_sql, verbose, quiet):
     """Import GS1 GPC data into a database"""
     # Configure logging
     if quiet:
@@ -82,8 +93,8 @@ def import_gpc(xml_file, db_file, db_type, download, language, download_dir, dum
             logging.warning("No cached XML files found. Using fallback file.")
             xml_file_path = DEFAULT_FALLBACK_XML_FILE
     
-    # Check if XML file exists
-    if not os.path.exists(xml_file_path):
+    # Check if XML file exists before creating or opening the database
+    if not xml_file_path or not os.path.isfile(xml_file_path):
         logging.error("XML file not found: %s", xml_file_path)
         sys.exit(1)
     
@@ -95,8 +106,10 @@ def import_gpc(xml_file, db_file, db_type, download, language, download_dir, dum
         logging.error("Failed to setup database. Exiting.")
         sys.exit(1)
     
-    # Create parser and process XML file
-    parser = GPCParser(db_connection)
+    # Create parser, restricted to the requested segments if any, and process XML file
+    if include_segments:
+        logging.info("Importing only segments: %s", ", ".join(include_segments))
+    parser = GPCParser(db_connection, segment_codes=include_segments)
     counters = parser.process_xml(xml_file_path)
     
     # Close database connection
@@ -9,6 +9,107 @@ import os
 import logging
 import sqlite3
 import importlib.util
+from itertools import chain
+from operator import itemgetter
+
+# SQLite settings tuned for bulk loading: write-ahead logging with relaxed
+# syncing, in-memory temporary storage and a 64 MiB page cache
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode = WAL;",
+    "PRAGMA synchronous = NORMAL;",
+    "PRAGMA temp_store = MEMORY;",
+    "PRAGMA cache_size = -65536;",
+)
+
+# GPC tables in parent-to-child (foreign key) order with their column names.
+# The first column of each table is its primary key.
+GPC_TABLE_COLUMNS = (
+    ('gpc_segments', ('segment_code', 'description')),
+    ('gpc_families', ('family_code', 'description', 'segment_code')),
+    ('gpc_classes', ('class_code', 'description', 'family_code')),
+    ('gpc_bricks', ('brick_code', 'description', 'class_code')),
+    ('gpc_attribute_types', ('att_type_code', 'att_type_text', 'brick_code')),
+    ('gpc_attribute_values', ('att_value_code', 'att_value_text', 'att_type_code')),
+)
+
+# Schema for the GPC tables, in parent-to-child order
+SQL_CREATE_TABLES = '''
+CREATE TABLE IF NOT EXISTS gpc_segments (
+    segment_code TEXT PRIMARY KEY,
+    description TEXT
+);
+CREATE TABLE IF NOT EXISTS gpc_families (
+    family_code TEXT PRIMARY KEY,
+    description TEXT,
+    segment_code TEXT,
+    FOREIGN KEY (segment_code) REFERENCES gpc_segments (segment_code)
+);
+CREATE TABLE IF NOT EXISTS gpc_classes (
+    class_code TEXT PRIMARY KEY,
+    description TEXT,
+    family_code TEXT,
+    FOREIGN KEY (family_code) REFERENCES gpc_families (family_code)
+);
+CREATE TABLE IF NOT EXISTS gpc_bricks (
+    brick_code TEXT PRIMARY KEY,
+    description TEXT,
+    class_code TEXT,
+    FOREIGN KEY (class_code) REFERENCES gpc_classes (class_code)
+);
+CREATE TABLE IF NOT EXISTS gpc_attribute_types (
+    att_type_code TEXT PRIMARY KEY,
+    att_type_text TEXT,
+    brick_code TEXT,
+    FOREIGN KEY (brick_code) REFERENCES gpc_bricks (brick_code)
+);
+CREATE TABLE IF NOT EXISTS gpc_attribute_values (
+    att_value_code TEXT PRIMARY KEY,
+    att_value_text TEXT,
+    att_type_code TEXT,
+    FOREIGN KEY (att_type_code) REFERENCES gpc_attribute_types (att_type_code)
+);
+'''
+
+# Indexes on the foreign key columns, created after data has been loaded
+SQL_CREATE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_gpc_families_segment_code ON gpc_families (segment_code);",
+    "CREATE INDEX IF NOT EXISTS idx_gpc_classes_family_code ON gpc_classes (family_code);",
+    "CREATE INDEX IF NOT EXISTS idx_gpc_bricks_class_code ON gpc_bricks (class_code);",
+    "CREATE INDEX IF NOT EXISTS idx_gpc_attribute_types_brick_code ON gpc_attribute_types (brick_code);",
+    "CREATE INDEX IF NOT EXISTS idx_gpc_attribute_values_att_type_code ON gpc_attribute_values (att_type_code);",
+)
+
+# Single-row insert statements, defined once so every call reuses the same
+# cached statement. Existing codes are ignored.
+SQL_INSERT_SEGMENT = "INSERT OR IGNORE INTO gpc_segments (segment_code, description) VALUES (?, ?);"
+SQL_INSERT_FAMILY = "INSERT OR IGNORE INTO gpc_families (family_code, description, segment_code) VALUES (?, ?, ?);"
+SQL_INSERT_CLASS = "INSERT OR IGNORE INTO gpc_classes (class_code, description, family_code) VALUES (?, ?, ?);"
+SQL_INSERT_BRICK = "INSERT OR IGNORE INTO gpc_bricks (brick_code, description, class_code) VALUES (?, ?, ?);"
+SQL_INSERT_ATTRIBUTE_TYPE = "INSERT OR IGNORE INTO gpc_attribute_types (att_type_code, att_type_text, brick_code) VALUES (?, ?, ?);"
+SQL_INSERT_ATTRIBUTE_VALUE = "INSERT OR IGNORE INTO gpc_attribute_values (att_value_code, att_value_text, att_type_code) VALUES (?, ?, ?);"
+
+# Plain INSERT statements for batches that have already been checked against
+# the stored keys, so SQLite does not need conflict handling for every row
+GPC_INSERT_SQL = {
+    table: f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))});"
+    for table, columns in GPC_TABLE_COLUMNS
+}
+
+# Rows per multi-row INSERT statement. Three columns per row keeps the bound
+# parameters under SQLite's historical limit of 999 per statement.
+INSERT_CHUNK_ROWS = 250
+
+
+def _multi_row_insert_sql(sql, row_count):
+    """Repeat the VALUES tuple of a single-row INSERT statement row_count times."""
+    head, values = sql.rstrip(';').split(' VALUES ')
+    return f"{head} VALUES {', '.join([values] * row_count)};"
+
+
+GPC_MULTI_ROW_INSERT_SQL = {
+    table: _multi_row_insert_sql(sql, INSERT_CHUNK_ROWS) for table, sql in GPC_INSERT_SQL.items()
+}
+
 
 class DatabaseConnection:
     """Database connection abstraction for SQLite and PostgreSQL."""
@@ -30,16 +131,23 @@ class DatabaseConnection:
         """
         Connect to the database.
         
+        An already open connection is reused, so repeated calls share one
+        connection and its session settings.
+        
         Returns:
             tuple: (connection, cursor) or (None, None) on failure
         """
+        if self.conn:
+            return self.conn, self.cursor
+            
         try:
             if self.db_type == 'sqlite':
-                # Check if directory exists, create if not
+                # Check if directory exists, create if not. exist_ok covers a
+                # directory created by another process after the check.
                 db_dir = os.path.dirname(self.connection_string)
-                if db_dir and not os.path.exists(db_dir):
+                if db_dir and not os.path.isdir(db_dir):
                     logging.info("Creating directory for database: %s", db_dir)
-                    os.makedirs(db_dir)
+                    os.makedirs(db_dir, exist_ok=True)
                 
                 self.conn = sqlite3.connect(self.connection_string)
                 self.cursor = self.conn.cursor()
@@ -47,6 +155,9 @@ class DatabaseConnection:
                 # Enable Foreign Key support in SQLite
                 self.cursor.execute("PRAGMA foreign_keys = ON;")
                 
+                for pragma in SQLITE_PRAGMAS:
+                    self.cursor.execute(pragma)
+                
             elif self.db_type == 'postgresql':
                 # Check if psycopg2 is installed
                 if not importlib.util.find_spec("psycopg2"):
@@ -69,11 +180,82 @@ class DatabaseConnection:
             return None, None
     
     def close(self):
-        """Close the database connection."""
+        """
+        Close the database connection.
+        
+        SQLite connections first run PRAGMA optimize, which refreshes query
+        planner statistics for tables that changed while the connection was open.
+        """
         if self.conn:
+            if self.db_type == 'sqlite':
+                try:
+                    self.cursor.execute("PRAGMA optimize;")
+                except sqlite3.Error as e:
+                    logging.warning("PRAGMA optimize failed: %s", e)
             self.conn.close()
+            self.conn = None
+            self.cursor = None
             logging.info("Database connection closed.")
     
+    def set_foreign_keys(self, enabled):
+        """
+        Enable or disable foreign key enforcement.
+        
+        SQLite only honours this outside a transaction. Other database types
+        are left unchanged.
+        
+        Args:
+            enabled (bool): True to enforce foreign keys, False to skip the checks
+        """
+        if self.conn and self.db_type == 'sqlite':
+            self.cursor.execute(f"PRAGMA foreign_keys = {'ON' if enabled else 'OFF'};")
+    
+    def set_exclusive_lock(self, enabled):
+        """
+        Hold the database file lock between transactions.
+        
+        With the exclusive locking mode SQLite keeps its lock after the first
+        write until the mode is switched back, instead of releasing and
+        re-acquiring it at every transaction boundary. Other connections
+        cannot use the file meanwhile. Other database types are left unchanged.
+        
+        Args:
+            enabled (bool): True to keep the lock, False to release it
+        """
+        if self.conn and self.db_type == 'sqlite':
+            self.cursor.execute(f"PRAGMA locking_mode = {'EXCLUSIVE' if enabled else 'NORMAL'};")
+            if not enabled:
+                # SQLite only drops the exclusive lock on the next file access
+                self.cursor.execute("SELECT 1 FROM sqlite_master LIMIT 1;")
+                self.cursor.fetchall()
+    
+    def check_foreign_keys(self):
+        """
+        Check the stored data for foreign key violations.
+        
+        Returns:
+            list: (table, rowid, parent table, constraint index) rows for each
+                  violation; always empty for non-SQLite databases
+        """
+        if not self.conn or self.db_type != 'sqlite':
+            return []
+        self.cursor.execute("PRAGMA foreign_key_check;")
+        return self.cursor.fetchall()
+    
+    def begin(self):
+        """
+        Begin an explicit transaction on the database.
+
+        For SQLite this issues a single BEGIN IMMEDIATE so that a bulk load is
+        written and journaled once at commit time instead of per statement.
+        The write lock is taken up front, so a competing writer is reported
+        before any work is done rather than part-way through the load.
+        PostgreSQL connections already open a transaction implicitly.
+        """
+        if self.conn and self.db_type == 'sqlite' and not self.conn.in_transaction:
+            self.cursor.execute("BEGIN IMMEDIATE")
+            logging.debug("Database transaction started.")
+
     def commit(self):
         """Commit changes to the database."""
         if self.conn:
@@ -103,52 +285,10 @@ def setup_database(db_connection):
         
     try:
         # Create tables with portable SQL syntax
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS gpc_segments (
-            segment_code TEXT PRIMARY KEY,
-            description TEXT
-        );
-        ''')
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS gpc_families (
-            family_code TEXT PRIMARY KEY,
-            description TEXT,
-            segment_code TEXT,
-            FOREIGN KEY (segment_code) REFERENCES gpc_segments (segment_code)
-        );
-        ''')
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS gpc_classes (
-            class_code TEXT PRIMARY KEY,
-            description TEXT,
-            family_code TEXT,
-            FOREIGN KEY (family_code) REFERENCES gpc_families (family_code)
-        );
-        ''')
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS gpc_bricks (
-            brick_code TEXT PRIMARY KEY,
-            description TEXT,
-            class_code TEXT,
-            FOREIGN KEY (class_code) REFERENCES gpc_classes (class_code)
-        );
-        ''')
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS gpc_attribute_types (
-            att_type_code TEXT PRIMARY KEY,
-            att_type_text TEXT,
-            brick_code TEXT,
-            FOREIGN KEY (brick_code) REFERENCES gpc_bricks (brick_code)
-        );
-        ''')
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS gpc_attribute_values (
-            att_value_code TEXT PRIMARY KEY,
-            att_value_text TEXT,
-            att_type_code TEXT,
-            FOREIGN KEY (att_type_code) REFERENCES gpc_attribute_types (att_type_code)
-        );
-        ''')
+        if db_connection.db_type == 'sqlite':
+            cursor.executescript(SQL_CREATE_TABLES)
+        else:
+            cursor.execute(SQL_CREATE_TABLES)
         
         logging.info("Tables checked/created successfully.")
         return True
@@ -158,29 +298,65 @@ def setup_database(db_connection):
         return False
 
 
-def insert_segment(cursor, segment_code, description):
+def create_indexes(cursor):
     """
-    Insert a segment record.
+    Create the foreign key indexes and refresh the query planner statistics.
+    
+    Building the indexes once after a bulk load is cheaper than maintaining
+    them row by row while inserting.
     
     Args:
         cursor: Database cursor
-        segment_code (str): Segment code
-        description (str): Segment description
         
     Returns:
         bool: True if successful, False otherwise
     """
     try:
-        cursor.execute('''
-        INSERT OR IGNORE INTO gpc_segments (segment_code, description)
-        VALUES (?, ?);
-        ''', (segment_code, description))
+        for statement in SQL_CREATE_INDEXES:
+            cursor.execute(statement)
+        cursor.execute("ANALYZE;")
+        return True
+    except Exception as e:
+        logging.error("Error creating indexes: %s", e)
+        return False
+
+
+def _insert_row(cursor, sql, row, kind):
+    """
+    Execute a single-row insert statement.
+    
+    Args:
+        cursor: Database cursor
+        sql (str): One of the SQL_INSERT_* statements
+        row (tuple): Row values, starting with the primary key code
+        kind (str): Record kind used in the error message
+        
+    Returns:
+        bool: True if a row was inserted, False if it existed or the insert failed
+    """
+    try:
+        cursor.execute(sql, row)
         return cursor.rowcount > 0
     except Exception as e:
-        logging.error("Error inserting segment %s: %s", segment_code, e)
+        logging.error("Error inserting %s %s: %s", kind, row[0], e)
         return False
 
 
+def insert_segment(cursor, segment_code, description):
+    """
+    Insert a segment record.
+    
+    Args:
+        cursor: Database cursor
+        segment_code (str): Segment code
+        description (str): Segment description
+        
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    return _insert_row(cursor, SQL_INSERT_SEGMENT, (segment_code, description), 'segment')
+
+
 def insert_family(cursor, family_code, description, segment_code):
     """
     Insert a family record.
@@ -194,15 +370,7 @@ def insert_family(cursor, family_code, description, segment_code):
     Returns:
         bool: True if successful, False otherwise
     """
-    try:
-        cursor.execute('''
-        INSERT OR IGNORE INTO gpc_families (family_code, description, segment_code)
-        VALUES (?, ?, ?);
-        ''', (family_code, description, segment_code))
-        return cursor.rowcount > 0
-    except Exception as e:
-        logging.error("Error inserting family %s: %s", family_code, e)
-        return False
+    return _insert_row(cursor, SQL_INSERT_FAMILY, (family_code, description, segment_code), 'family')
 
 
 def insert_class(cursor, class_code, description, family_code):
@@ -218,15 +386,7 @@ def insert_class(cursor, class_code, description, family_code):
     Returns:
         bool: True if successful, False otherwise
     """
-    try:
-        cursor.execute('''
-        INSERT OR IGNORE INTO gpc_classes (class_code, description, family_code)
-        VALUES (?, ?, ?);
-        ''', (class_code, description, family_code))
-        return cursor.rowcount > 0
-    except Exception as e:
-        logging.error("Error inserting class %s: %s", class_code, e)
-        return False
+    return _insert_row(cursor, SQL_INSERT_CLASS, (class_code, description, family_code), 'class')
 
 
 def insert_brick(cursor, brick_code, description, class_code):
@@ -242,15 +402,7 @@ def insert_brick(cursor, brick_code, description, class_code):
     Returns:
         bool: True if successful, False otherwise
     """
-    try:
-        cursor.execute('''
-        INSERT OR IGNORE INTO gpc_bricks (brick_code, description, class_code)
-        VALUES (?, ?, ?);
-        ''', (brick_code, description, class_code))
-        return cursor.rowcount > 0
-    except Exception as e:
-        logging.error("Error inserting brick %s: %s", brick_code, e)
-        return False
+    return _insert_row(cursor, SQL_INSERT_BRICK, (brick_code, description, class_code), 'brick')
 
 
 def insert_attribute_type(cursor, att_type_code, att_type_text, brick_code):
@@ -266,15 +418,7 @@ def insert_attribute_type(cursor, att_type_code, att_type_text, brick_code):
     Returns:
         bool: True if successful, False otherwise
     """
-    try:
-        cursor.execute('''
-        INSERT OR IGNORE INTO gpc_attribute_types (att_type_code, att_type_text, brick_code)
-        VALUES (?, ?, ?);
-        ''', (att_type_code, att_type_text, brick_code))
-        return cursor.rowcount > 0
-    except Exception as e:
-        logging.error("Error inserting attribute type %s: %s", att_type_code, e)
-        return False
+    return _insert_row(cursor, SQL_INSERT_ATTRIBUTE_TYPE, (att_type_code, att_type_text, brick_code), 'attribute type')
 
 
 def insert_attribute_value(cursor, att_value_code, att_value_text, att_type_code):
@@ -290,12 +434,56 @@ def insert_attribute_value(cursor, att_value_code, att_value_text, att_type_code
     Returns:
         bool: True if successful, False otherwise
     """
+    return _insert_row(cursor, SQL_INSERT_ATTRIBUTE_VALUE, (att_value_code, att_value_text, att_type_code), 'attribute value')
+
+
+def fetch_existing_codes(cursor, table):
+    """
+    Fetch the primary key codes already stored in a GPC table.
+    
+    Args:
+        cursor: Database cursor
+        table (str): Name of a table listed in GPC_TABLE_COLUMNS
+        
+    Returns:
+        set: Codes present in the table
+    """
+    columns = dict(GPC_TABLE_COLUMNS)[table]
+    cursor.execute(f"SELECT {columns[0]} FROM {table};")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def insert_rows(cursor, table, rows):
+    """
+    Insert a batch of records into a GPC table.
+    
+    Rows are sorted by primary key so SQLite appends to the key B-tree instead
+    of splitting pages at random positions, then written INSERT_CHUNK_ROWS at
+    a time with a multi-row INSERT statement, which SQLite executes much faster
+    than one statement per row. Any remainder is written with executemany.
+    
+    The rows must be new: plain INSERT statements are used, so a code that
+    already exists in the table fails the whole batch.
+    
+    Args:
+        cursor: Database cursor
+        table (str): Name of a table listed in GPC_TABLE_COLUMNS
+        rows (list): Row tuples in the table's column order
+        
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if not rows:
+        return True
+    rows = sorted(rows, key=itemgetter(0))
+    full_chunks_end = len(rows) - len(rows) % INSERT_CHUNK_ROWS
     try:
-        cursor.execute('''
-        INSERT OR IGNORE INTO gpc_attribute_values (att_value_code, att_value_text, att_type_code)
-        VALUES (?, ?, ?);
-        ''', (att_value_code, att_value_text, att_type_code))
-        return cursor.rowcount > 0
+        chunk_sql = GPC_MULTI_ROW_INSERT_SQL[table]
+        for start in range(0, full_chunks_end, INSERT_CHUNK_ROWS):
+            cursor.execute(chunk_sql, list(chain.from_iterable(rows[start:start + INSERT_CHUNK_ROWS])))
+        if full_chunks_end < len(rows):
+            cursor.executemany(GPC_INSERT_SQL[table], rows[full_chunks_end:])
+        return True
     except Exception as e:
-        logging.error("Error inserting attribute value %s: %s", att_value_code, e)
-        return False
\ No newline at end of file
+        logging.error("Error inserting %s rows into %s: %s", len(rows), table, e)
+        return False
@@ -17,6 +17,10 @@ from datetime import datetime
 SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 GPC_EXPORT_DIR = os.path.join(SCRIPT_DIR, 'data', 'exports')
 
+# Prefixes of the iterdump() lines copied into GPC dumps besides the gpc_
+# CREATE statements: transaction and pragma lines, and the gpc_ table rows
+DUMP_KEEP_PREFIXES = ('BEGIN TRANSACTION;', 'COMMIT;', 'PRAGMA ', 'INSERT INTO "gpc_')
+
 
 class GPCExporter:
     """
@@ -45,7 +49,9 @@ class GPCExporter:
         
         This method extracts all tables with names starting with 'gpc_' from the
         specified SQLite database and creates a SQL dump file. The dump file includes
-        both the table structure (CREATE statements) and the data (INSERT statements).
+        the table structure and indexes (CREATE statements) and the data (INSERT
+        statements). The database's own dump is streamed to the file and filtered,
+        so the data is never copied or held in memory.
         
         The SQL file is saved in the export directory with the naming convention:
         {language_code}-v{date}.sql
@@ -67,61 +73,37 @@ class GPCExporter:
             
             # Connect to the database
             conn = sqlite3.connect(db_file_path)
-            
-            # Create a temporary in-memory database with only the gpc_ tables
-            temp_conn = sqlite3.connect(":memory:")
-            
-            # Get list of all gpc_ tables
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'gpc_%';")
-            tables = [table[0] for table in cursor.fetchall()]
-            
-            if not tables:
-                logging.warning("No GPC tables found in the database")
-                return None
+            try:
+                cursor = conn.cursor()
                 
-            # Copy each gpc_ table to the temporary database
-            for table in tables:
-                # Get the CREATE statement for the table
-                cursor.execute(f"SELECT sql FROM sqlite_master WHERE type='table' AND name='{table}';")
-                create_stmt = cursor.fetchone()[0]
+                # Get list of all gpc_ tables
+                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'gpc_%';")
+                tables = [table[0] for table in cursor.fetchall()]
                 
-                # Create the table in the temporary database
-                temp_conn.execute(create_stmt)
+                if not tables:
+                    logging.warning("No GPC tables found in the database")
+                    return None
                 
-                # Copy the data
-                cursor.execute(f"SELECT * FROM {table};")
-                rows = cursor.fetchall()
+                # CREATE statements of the gpc_ tables and their indexes, as
+                # iterdump() emits them
+                cursor.execute("SELECT sql FROM sqlite_master WHERE tbl_name LIKE 'gpc_%' AND sql NOT NULL;")
+                create_stmts = {f"{row[0]};" for row in cursor.fetchall()}
                 
-                if rows:
-                    # Get column names for the INSERT statement
-                    cursor.execute(f"PRAGMA table_info({table});")
-                    columns = [col[1] for col in cursor.fetchall()]
-                    placeholders = ", ".join(["?" for _ in columns])
+                # Stream the dump of the source database, keeping only the
+                # statements that belong to the gpc_ tables
+                with open(sql_file_path, 'w') as f:
+                    # Write header
+                    f.write("-- GPC Database Dump\n")
+                    f.write(f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                    f.write(f"-- Source: {db_file_path}\n")
+                    f.write("-- Tables: " + ", ".join(tables) + "\n\n")
                     
-                    # Insert the data into the temporary database
-                    temp_conn.executemany(
-                        f"INSERT INTO {table} VALUES ({placeholders});", 
-                        rows
-                    )
-            
-            temp_conn.commit()
-            
-            # Use iterdump() to generate the SQL dump
-            with open(sql_file_path, 'w') as f:
-                # Write header
-                f.write("-- GPC Database Dump\n")
-                f.write(f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"-- Source: {db_file_path}\n")
-                f.write("-- Tables: " + ", ".join(tables) + "\n\n")
-                
-                # Write the SQL dump
-                for line in temp_conn.iterdump():
-                    f.write(line + "\n")
-            
-            # Close connections
-            temp_conn.close()
-            conn.close()
+                    # Write the SQL dump
+                    for line in conn.iterdump():
+                        if line.startswith(DUMP_KEEP_PREFIXES) or line in create_stmts:
+                            f.write(line + "\n")
+            finally:
+                conn.close()
             
             logging.info("Database successfully dumped to %s", sql_file_path)
             return sql_file_path
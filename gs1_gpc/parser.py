@@ -10,11 +10,16 @@ the GPCParser class.
 """
 
 import logging
-import xml.etree.ElementTree as ET
-from .db import (
-    insert_segment, insert_family, insert_class, insert_brick,
-    insert_attribute_type, insert_attribute_value
-)
+
+# Prefer the libxml2-backed lxml parser when available
+try:
+    from lxml import etree as ET
+    HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAS_LXML = False
+
+from .db import GPC_TABLE_COLUMNS, create_indexes, fetch_existing_codes, insert_rows
 from .models import GPCModels
 from .callbacks import GPCProcessedCallback
 
@@ -43,16 +48,25 @@ class GPCParser:
     GPCProcessedCallback interface.
     """
     
-    def __init__(self, db_connection, callback=None):
+    def __init__(self, db_connection, callback=None, segment_codes=None):
         """
         Initialize a GPCParser.
         
         Args:
             db_connection: Database connection object
             callback (GPCProcessedCallback, optional): Callback for processing events
+            segment_codes (iterable, optional): Segment codes to import. If given,
+                                                all other segments and their
+                                                descendants are skipped.
         """
         self.db_connection = db_connection
         self.callback = callback
+        self.segment_codes = frozenset(segment_codes) if segment_codes is not None else None
+        # Choose the segment predicate once instead of testing for a filter per segment
+        if self.segment_codes is None:
+            self._include_segment = lambda segment_code: True
+        else:
+            self._include_segment = self.segment_codes.__contains__
         self.models = GPCModels()
         self.counters = {
             'segments_processed': 0, 'segments_inserted': 0,
@@ -62,6 +76,12 @@ class GPCParser:
             'attribute_types_processed': 0, 'attribute_types_inserted': 0,
             'attribute_values_processed': 0, 'attribute_values_inserted': 0,
         }
+        # Pending rows per table and the codes already stored or queued
+        self._rows = {table: [] for table, _ in GPC_TABLE_COLUMNS}
+        self._seen = {table: set() for table, _ in GPC_TABLE_COLUMNS}
+        # Segment elements found by the current load, and those the filter excluded
+        self._segments_seen = 0
+        self._segments_skipped = 0
     
     def process_xml(self, xml_file_path):
         """
@@ -83,84 +103,238 @@ class GPCParser:
         """
         logging.info("Starting GS1 GPC XML processing from: %s", xml_file_path)
         
-        conn, cursor = None, None
+        # Setup database connection
+        conn, cursor = self.db_connection.connect()
+        if not conn or not cursor:
+            logging.error("Database connection failed. Aborting.")
+            self._finish()
+            return self.counters
+            
+        # Start streaming the XML and validate the root element
+        parsed = self._open_xml(xml_file_path)
+        if parsed is None:
+            self._finish()
+            return self.counters
+        xml_file, context, root = parsed
         
         try:
-            # Setup database connection
-            conn, cursor = self.db_connection.connect()
-            if not conn or not cursor:
-                logging.error("Database connection failed. Aborting.")
-                return self.counters
-                
-            # Parse XML
-            logging.info("Parsing XML file: %s...", xml_file_path)
-            try:
-                tree = ET.parse(xml_file_path)
-                root = tree.getroot()
-                logging.info("XML parsing successful.")
-                
-                # Check root element
-                if root.tag != EXPECTED_ROOT_TAG:
-                    raise ValueError(f"Root element is not <{EXPECTED_ROOT_TAG}> as expected but instead found <{root.tag}>.")
-                    
-            except ET.ParseError as e:
-                logging.error("XML parsing failed: %s", e)
-                return self.counters
-            except FileNotFoundError:
-                logging.error("XML file not found: %s", xml_file_path)
-                return self.counters
-            except ValueError as e:
-                logging.error("XML file does not have the expected structure: %s - %s", xml_file_path, e)
-                return self.counters
-                
-            # Find segment elements
-            segment_elements = root.findall(TAG_SEGMENT)
-            if not segment_elements:
-                segment_elements = root.findall(f".//{TAG_SEGMENT}")
-                
-            if not segment_elements:
-                logging.warning("No segment elements found in the XML file.")
-                return self.counters
-                
-            # Process segments
-            for segment_elem in segment_elements:
-                self._process_segment(cursor, segment_elem)
+            self._load(cursor, context, root)
             
             # Commit changes
             self.db_connection.commit()
             logging.info("Database commit successful.")
             
+        except ET.ParseError as e:
+            logging.error("XML parsing failed: %s", e)
+            self.db_connection.rollback()
+            
         except Exception as e:
             logging.error("An unexpected error occurred during processing: %s", e, exc_info=True)
-            if conn:
-                self.db_connection.rollback()
+            self.db_connection.rollback()
+            
+        else:
+            violations = self.db_connection.check_foreign_keys()
+            if violations:
+                logging.warning("Foreign key check found %s violations after import.", len(violations))
         
         finally:
-            # Log summary
-            self._log_summary()
-            
-            # Call completion callback if provided
-            if self.callback:
-                self.callback.on_processing_complete(self.counters)
+            # Restore foreign key enforcement and normal locking for later users
+            # of the connection
+            self.db_connection.set_foreign_keys(True)
+            self.db_connection.set_exclusive_lock(False)
+            xml_file.close()
+            self._finish()
             
         return self.counters
     
-    def _process_segment(self, cursor, segment_elem):
+    def _open_xml(self, xml_file_path):
+        """
+        Start streaming the XML file and check its root element.
+        
+        The file is opened here and handed back to the caller, who must close it
+        once the context is exhausted; it is closed here if the file cannot be used.
+        
+        Args:
+            xml_file_path (str): Path to the GS1 GPC XML file
+            
+        Returns:
+            tuple: (open XML file, iterparse context, root element) or None if the
+                   file cannot be used
+        """
+        logging.info("Parsing XML file: %s...", xml_file_path)
+        try:
+            xml_file = open(xml_file_path, 'rb')
+        except OSError as e:
+            logging.error("XML file not found or unreadable: %s - %s", xml_file_path, e)
+            return None
+            
+        try:
+            if HAS_LXML:
+                # Read the root from a short separate pass. The main pass only
+                # reports completed segments, filtered inside libxml2, so no
+                # other element events reach Python. The indentation between
+                # elements is never read, so it is not kept in the tree.
+                _, root = next(ET.iterparse(xml_file, events=('start',)))
+                xml_file.seek(0)
+                context = ET.iterparse(xml_file, events=('end',), tag=TAG_SEGMENT,
+                                       remove_blank_text=True)
+            else:
+                context = ET.iterparse(xml_file, events=('start', 'end'))
+                _, root = next(context)
+        except ET.ParseError as e:
+            logging.error("XML parsing failed: %s", e)
+            xml_file.close()
+            return None
+        except OSError as e:
+            logging.error("XML file not found or unreadable: %s - %s", xml_file_path, e)
+            xml_file.close()
+            return None
+            
+        # Check root element
+        if root.tag != EXPECTED_ROOT_TAG:
+            logging.error("XML file does not have the expected structure: %s - Root element is not <%s> as expected but instead found <%s>.",
+                          xml_file_path, EXPECTED_ROOT_TAG, root.tag)
+            xml_file.close()
+            return None
+            
+        return xml_file, context, root
+    
+    def _load(self, cursor, context, root):
+        """
+        Walk the remaining XML and write all rows inside a single transaction.
+        
+        The caller is responsible for committing or rolling back.
+        
+        Args:
+            cursor: Database cursor
+            context: Iterator of (event, element) pairs from ET.iterparse
+            root: Root element of the document
+        """
+        # This process is the only writer for the whole load
+        self.db_connection.set_exclusive_lock(True)
+        
+        # Load existing codes so duplicates are detected without per-row queries,
+        # and drop rows left queued by an earlier load that was rolled back
+        for table, _ in GPC_TABLE_COLUMNS:
+            self._seen[table] = fetch_existing_codes(cursor, table)
+            self._rows[table] = []
+            
+        # Process segments as they are parsed, inside a single transaction.
+        # Rows arrive parent-first, so foreign keys are verified once afterwards.
+        self.db_connection.set_foreign_keys(False)
+        self.db_connection.begin()
+        self._segments_seen = 0
+        self._segments_skipped = 0
+        for segment_elem in self._iter_segments(context, root):
+            self._process_segment(segment_elem)
+        logging.info("XML parsing successful.")
+            
+        if not self._segments_seen:
+            logging.warning("No segment elements found in the XML file.")
+        elif self._segments_skipped == self._segments_seen:
+            logging.warning("All %s segments in the XML file were excluded by the segment filter.",
+                            self._segments_seen)
+        
+        self._flush_rows(cursor)
+        
+        # Build the lookup indexes once the data is in place
+        if not create_indexes(cursor):
+            raise RuntimeError("Index creation failed")
+    
+    def _flush_rows(self, cursor):
+        """
+        Insert all queued rows in parent-to-child order and empty the queues.
+        
+        Args:
+            cursor: Database cursor
+        """
+        for table, _ in GPC_TABLE_COLUMNS:
+            if not insert_rows(cursor, table, self._rows[table]):
+                raise RuntimeError(f"Batch insert into {table} failed")
+            self._rows[table] = []
+    
+    def _iter_segments(self, context, root):
+        """
+        Yield included segment elements from an iterparse context as soon as they are complete.
+        
+        Each segment is cleared and detached from its parent once the caller has
+        processed it, so only one segment subtree is held in memory at a time.
+        Segments excluded by the segment filter are never yielded. Without lxml
+        the filter is applied at the segment's start event, and the excluded
+        subtree is discarded element by element as it is parsed.
+        
+        Args:
+            context: Iterator of (event, element) pairs from ET.iterparse
+            root: Root element returned by the first 'start' event
+                (not used with lxml, whose elements know their parent)
+            
+        Yields:
+            Element: Fully parsed segment element
+        """
+        if HAS_LXML:
+            for _, elem in context:
+                if self._count_segment(elem):
+                    yield elem
+                elem.clear()
+                elem.getparent().remove(elem)
+            return
+            
+        open_elements = [root]
+        # Depth of the excluded segment being skipped, or None
+        skip_depth = None
+        for event, elem in context:
+            if event == 'start':
+                if skip_depth is None and elem.tag == TAG_SEGMENT and not self._count_segment(elem):
+                    skip_depth = len(open_elements)
+                open_elements.append(elem)
+                continue
+            open_elements.pop()
+            if skip_depth is not None:
+                elem.clear()
+                open_elements[-1].remove(elem)
+                if len(open_elements) == skip_depth:
+                    skip_depth = None
+                continue
+            if elem.tag == TAG_SEGMENT:
+                yield elem
+                elem.clear()
+                if open_elements:
+                    open_elements[-1].remove(elem)
+    
+    def _count_segment(self, segment_elem):
+        """
+        Count a segment element found in the file and apply the segment filter.
+        
+        Args:
+            segment_elem: Segment element; only its attributes are read
+            
+        Returns:
+            bool: True if the segment should be imported, False if it is skipped
+        """
+        self._segments_seen += 1
+        segment_code = segment_elem.get(ATTR_CODE)
+        if self._include_segment(segment_code):
+            return True
+        self._segments_skipped += 1
+        logging.debug("Skipping segment %s excluded by the segment filter.", segment_code)
+        return False
+    
+    def _process_segment(self, segment_elem):
         """
         Process a segment element and its children.
         
-        Extracts segment code and description, inserts into database,
+        Extracts segment code and description, queues it for database insertion,
         adds to the models container, and processes child family elements.
         """
-        self.counters['segments_processed'] += 1
         segment_code = segment_elem.get(ATTR_CODE)
+        self.counters['segments_processed'] += 1
         segment_desc = segment_elem.get(ATTR_TEXT)
         
         if not segment_code or not segment_desc:
             logging.warning("Skipping segment element missing code or description.")
             return
             
-        is_new = insert_segment(cursor, segment_code, segment_desc)
+        is_new = self._queue_row('gpc_segments', (segment_code, segment_desc))
         if is_new:
             self.counters['segments_inserted'] += 1
         
@@ -174,16 +348,17 @@ class GPCParser:
             
         # Process families
         for family_elem in segment_elem.findall(TAG_FAMILY):
-            self._process_family(cursor, family_elem, segment_code)
+            self._process_family(family_elem, segment)
     
-    def _process_family(self, cursor, family_elem, segment_code):
+    def _process_family(self, family_elem, segment):
         """
         Process a family element and its children.
         
-        Extracts family code and description, inserts into database with parent segment code,
+        Extracts family code and description, queues it for database insertion with parent segment code,
         adds to the models container, and processes child class elements.
         """
         self.counters['families_processed'] += 1
+        segment_code = segment.code
         family_code = family_elem.get(ATTR_CODE)
         family_desc = family_elem.get(ATTR_TEXT)
         
@@ -191,13 +366,13 @@ class GPCParser:
             logging.warning("Skipping family element missing code or description.")
             return
             
-        is_new = insert_family(cursor, family_code, family_desc, segment_code)
+        is_new = self._queue_row('gpc_families', (family_code, family_desc, segment_code))
         if is_new:
             self.counters['families_inserted'] += 1
         
         # Add to models
         family = GPCModels.Family(family_code, family_desc, segment_code)
-        self.models.segments[segment_code].families[family_code] = family
+        segment.families[family_code] = family
         
         # Call callback if provided
         if self.callback:
@@ -205,16 +380,17 @@ class GPCParser:
             
         # Process classes
         for class_elem in family_elem.findall(TAG_CLASS):
-            self._process_class(cursor, class_elem, family_code, segment_code)
+            self._process_class(class_elem, family)
     
-    def _process_class(self, cursor, class_elem, family_code, segment_code):
+    def _process_class(self, class_elem, family):
         """
         Process a class element and its children.
         
-        Extracts class code and description, inserts into database with parent family code,
+        Extracts class code and description, queues it for database insertion with parent family code,
         adds to the models container, and processes child brick elements.
         """
         self.counters['classes_processed'] += 1
+        family_code = family.code
         class_code = class_elem.get(ATTR_CODE)
         class_desc = class_elem.get(ATTR_TEXT)
         
@@ -222,13 +398,13 @@ class GPCParser:
             logging.warning("Skipping class element missing code or description.")
             return
             
-        is_new = insert_class(cursor, class_code, class_desc, family_code)
+        is_new = self._queue_row('gpc_classes', (class_code, class_desc, family_code))
         if is_new:
             self.counters['classes_inserted'] += 1
         
         # Add to models
         class_obj = GPCModels.Class(class_code, class_desc, family_code)
-        self.models.segments[segment_code].families[family_code].classes[class_code] = class_obj
+        family.classes[class_code] = class_obj
         
         # Call callback if provided
         if self.callback:
@@ -236,17 +412,18 @@ class GPCParser:
             
         # Process bricks
         for brick_elem in class_elem.findall(TAG_BRICK):
-            self._process_brick(cursor, brick_elem, class_code, family_code, segment_code)
+            self._process_brick(brick_elem, class_obj)
     
-    def _process_brick(self, cursor, brick_elem, class_code, family_code, segment_code):
+    def _process_brick(self, brick_elem, class_obj):
         """
         Process a brick element and its children.
         
-        Extracts brick code and description, inserts into database with parent class code,
+        Extracts brick code and description, queues it for database insertion with parent class code,
         adds to the models container, and processes child attribute type elements.
         Bricks are the fundamental building blocks of the GPC system.
         """
         self.counters['bricks_processed'] += 1
+        class_code = class_obj.code
         brick_code = brick_elem.get(ATTR_CODE)
         brick_desc = brick_elem.get(ATTR_TEXT)
         
@@ -254,13 +431,13 @@ class GPCParser:
             logging.warning("Skipping brick element missing code or description.")
             return
             
-        is_new = insert_brick(cursor, brick_code, brick_desc, class_code)
+        is_new = self._queue_row('gpc_bricks', (brick_code, brick_desc, class_code))
         if is_new:
             self.counters['bricks_inserted'] += 1
         
         # Add to models
         brick = GPCModels.Brick(brick_code, brick_desc, class_code)
-        self.models.segments[segment_code].families[family_code].classes[class_code].bricks[brick_code] = brick
+        class_obj.bricks[brick_code] = brick
         
         # Call callback if provided
         if self.callback:
@@ -268,17 +445,18 @@ class GPCParser:
             
         # Process attribute types
         for att_type_elem in brick_elem.findall(TAG_ATTRIB_TYPE):
-            self._process_attribute_type(cursor, att_type_elem, brick_code, class_code, family_code, segment_code)
+            self._process_attribute_type(att_type_elem, brick)
     
-    def _process_attribute_type(self, cursor, att_type_elem, brick_code, class_code, family_code, segment_code):
+    def _process_attribute_type(self, att_type_elem, brick):
         """
         Process an attribute type element and its children.
         
-        Extracts attribute type code and description, inserts into database with parent brick code,
+        Extracts attribute type code and description, queues it for database insertion with parent brick code,
         adds to the models container, and processes child attribute value elements.
         Attribute types define categories of attributes that can be assigned to bricks.
         """
         self.counters['attribute_types_processed'] += 1
+        brick_code = brick.code
         att_type_code = att_type_elem.get(ATTR_CODE)
         att_type_text = att_type_elem.get(ATTR_TEXT)
         
@@ -286,13 +464,13 @@ class GPCParser:
             logging.warning("Skipping attribute type element missing code or description.")
             return
             
-        is_new = insert_attribute_type(cursor, att_type_code, att_type_text, brick_code)
+        is_new = self._queue_row('gpc_attribute_types', (att_type_code, att_type_text, brick_code))
         if is_new:
             self.counters['attribute_types_inserted'] += 1
         
         # Add to models
         att_type = GPCModels.AttributeType(att_type_code, att_type_text, brick_code)
-        self.models.segments[segment_code].families[family_code].classes[class_code].bricks[brick_code].attribute_types[att_type_code] = att_type
+        brick.attribute_types[att_type_code] = att_type
         
         # Call callback if provided
         if self.callback:
@@ -300,17 +478,18 @@ class GPCParser:
             
         # Process attribute values
         for att_value_elem in att_type_elem.findall(TAG_ATTRIB_VALUE):
-            self._process_attribute_value(cursor, att_value_elem, att_type_code, brick_code, class_code, family_code, segment_code)
+            self._process_attribute_value(att_value_elem, att_type)
     
-    def _process_attribute_value(self, cursor, att_value_elem, att_type_code, brick_code, class_code, family_code, segment_code):
+    def _process_attribute_value(self, att_value_elem, att_type):
         """
         Process an attribute value element.
         
-        Extracts attribute value code and description, inserts into database with parent attribute type code,
+        Extracts attribute value code and description, queues it for database insertion with parent attribute type code,
         and adds to the models container. Attribute values are specific values that can be assigned to
         attribute types for a particular brick.
         """
         self.counters['attribute_values_processed'] += 1
+        att_type_code = att_type.code
         att_value_code = att_value_elem.get(ATTR_CODE)
         att_value_text = att_value_elem.get(ATTR_TEXT)
         
@@ -318,18 +497,42 @@ class GPCParser:
             logging.warning("Skipping attribute value element missing code or description.")
             return
             
-        is_new = insert_attribute_value(cursor, att_value_code, att_value_text, att_type_code)
+        is_new = self._queue_row('gpc_attribute_values', (att_value_code, att_value_text, att_type_code))
         if is_new:
             self.counters['attribute_values_inserted'] += 1
         
         # Add to models
         att_value = GPCModels.AttributeValue(att_value_code, att_value_text, att_type_code)
-        self.models.segments[segment_code].families[family_code].classes[class_code].bricks[brick_code].attribute_types[att_type_code].attribute_values[att_value_code] = att_value
+        att_type.attribute_values[att_value_code] = att_value
         
         # Call callback if provided
         if self.callback:
             self.callback.on_attribute_value_processed(att_value_code, att_value_text, att_type_code, is_new)
     
+    def _queue_row(self, table, row):
+        """
+        Queue a row for batch insertion unless its code was already seen.
+        
+        Args:
+            table (str): Target table name
+            row (tuple): Row values, starting with the primary key code
+            
+        Returns:
+            bool: True if the row is new and was queued, False otherwise
+        """
+        seen = self._seen[table]
+        if row[0] in seen:
+            return False
+        seen.add(row[0])
+        self._rows[table].append(row)
+        return True
+    
+    def _finish(self):
+        """Log the processing summary and notify the callback that processing is complete."""
+        self._log_summary()
+        if self.callback:
+            self.callback.on_processing_complete(self.counters)
+    
     def _log_summary(self):
         """
         Log processing summary.
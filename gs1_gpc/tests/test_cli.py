@@ -0,0 +1,45 @@
+"""Tests for the cli module."""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from click.testing import CliRunner
+from gs1_gpc.cli import cli
+
+SAMPLE_XML = os.path.join(os.path.dirname(__file__), 'data', 'sample_gpc.xml')
+
+
+class TestImportGPC(unittest.TestCase):
+    """Test the import-gpc command."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'gpc.sqlite3')
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_include_segments(self):
+        """Test that --include-segments limits the import to the listed segments."""
+        result = CliRunner().invoke(cli, ['import-gpc', '--xml-file', SAMPLE_XML, '--db-file', self.db_file,
+                                          '--include-segments', '10000000, 99999999', '--quiet'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        conn = sqlite3.connect(self.db_file)
+        segments = conn.execute("SELECT segment_code FROM gpc_segments;").fetchall()
+        conn.close()
+        self.assertEqual(segments, [('10000000',)])
+
+    def test_include_segments_rejects_empty_list(self):
+        """Test that an --include-segments value without any code is a usage error."""
+        result = CliRunner().invoke(cli, ['import-gpc', '--xml-file', SAMPLE_XML, '--db-file', self.db_file,
+                                          '--include-segments', ' , ', '--quiet'])
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn('--include-segments', result.output)
+        self.assertFalse(os.path.exists(self.db_file))
+
+if __name__ == '__main__':
+    unittest.main()
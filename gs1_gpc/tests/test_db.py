@@ -3,7 +3,7 @@
 import os
 import tempfile
 import unittest
-from gs1_gpc.db import DatabaseConnection, setup_database
+from gs1_gpc.db import DatabaseConnection, setup_database, insert_rows, insert_segment, INSERT_CHUNK_ROWS
 
 class TestDatabaseConnection(unittest.TestCase):
     """Test the DatabaseConnection class."""
@@ -15,8 +15,9 @@ class TestDatabaseConnection(unittest.TestCase):
         
     def tearDown(self):
         """Tear down test fixtures."""
-        if os.path.exists(self.temp_db.name):
-            os.unlink(self.temp_db.name)
+        for path in (self.temp_db.name, self.temp_db.name + '-wal', self.temp_db.name + '-shm'):
+            if os.path.exists(path):
+                os.unlink(path)
     
     def test_sqlite_connection(self):
         """Test SQLite connection."""
@@ -26,6 +27,26 @@ class TestDatabaseConnection(unittest.TestCase):
         self.assertIsNotNone(cursor)
         db_connection.close()
     
+    def test_connect_reuses_open_connection(self):
+        """Test that connecting twice returns the same connection until closed."""
+        db_connection = DatabaseConnection(self.temp_db.name)
+        conn, cursor = db_connection.connect()
+        self.assertIs(db_connection.connect()[0], conn)
+        db_connection.close()
+        self.assertIsNone(db_connection.conn)
+        self.assertIsNot(db_connection.connect()[0], conn)
+        db_connection.close()
+    
+    def test_sqlite_bulk_load_pragmas(self):
+        """Test that SQLite connections use WAL journaling."""
+        db_connection = DatabaseConnection(self.temp_db.name)
+        conn, cursor = db_connection.connect()
+        cursor.execute("PRAGMA journal_mode;")
+        self.assertEqual(cursor.fetchone()[0], 'wal')
+        cursor.execute("PRAGMA synchronous;")
+        self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+        db_connection.close()
+    
     def test_setup_database(self):
         """Test database setup."""
         db_connection = DatabaseConnection(self.temp_db.name)
@@ -39,5 +60,26 @@ class TestDatabaseConnection(unittest.TestCase):
         self.assertEqual(len(tables), 6)  # 6 tables should be created
         db_connection.close()
 
+    def test_insert_segment_reports_new_rows(self):
+        """Test that single-row inserts report whether the code was new."""
+        db_connection = DatabaseConnection(self.temp_db.name)
+        setup_database(db_connection)
+        conn, cursor = db_connection.connect()
+        self.assertTrue(insert_segment(cursor, '10000000', 'Segment'))
+        self.assertFalse(insert_segment(cursor, '10000000', 'Segment'))
+        db_connection.close()
+    
+    def test_insert_rows_in_chunks(self):
+        """Test batch inserts spanning full chunks and a remainder."""
+        db_connection = DatabaseConnection(self.temp_db.name)
+        setup_database(db_connection)
+        conn, cursor = db_connection.connect()
+        rows = [(str(10000000 + i), f"Segment {i}") for i in range(2 * INSERT_CHUNK_ROWS + 7)]
+        self.assertTrue(insert_rows(cursor, 'gpc_segments', rows))
+        cursor.execute("SELECT COUNT(*), MAX(segment_code) FROM gpc_segments;")
+        self.assertEqual(cursor.fetchone(), (len(rows), rows[-1][0]))
+        self.assertFalse(insert_rows(cursor, 'gpc_segments', rows[-1:]))
+        db_connection.close()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""Tests for the exporter module."""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from gs1_gpc.db import DatabaseConnection, setup_database
+from gs1_gpc.parser import GPCParser
+from gs1_gpc.exporter import GPCExporter
+
+SAMPLE_XML = os.path.join(os.path.dirname(__file__), 'data', 'sample_gpc.xml')
+
+
+class TestGPCExporter(unittest.TestCase):
+    """Test the GPCExporter class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'gpc.sqlite3')
+        db_connection = DatabaseConnection(self.db_file)
+        setup_database(db_connection)
+        GPCParser(db_connection).process_xml(SAMPLE_XML)
+        conn, cursor = db_connection.connect()
+        cursor.execute("CREATE TABLE notes (note TEXT);")
+        cursor.execute("INSERT INTO notes VALUES ('not exported');")
+        conn.commit()
+        db_connection.close()
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_dump_database_to_sql(self):
+        """Test that the dump recreates the GPC tables and nothing else."""
+        sql_file = GPCExporter(export_dir=self.temp_dir).dump_database_to_sql(self.db_file)
+        self.assertIsNotNone(sql_file)
+        with open(sql_file) as f:
+            dump = f.read()
+        self.assertNotIn('notes', dump)
+        self.assertNotIn('sqlite_stat1', dump)
+
+        conn = sqlite3.connect(':memory:')
+        conn.executescript(dump)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM gpc_bricks;").fetchone()[0], 4)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM gpc_attribute_values;").fetchone()[0], 3)
+        indexes = conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_gpc_%';")
+        self.assertEqual(len(indexes.fetchall()), 5)
+        conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+"""Tests for the parser module."""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from gs1_gpc.db import DatabaseConnection, setup_database
+from gs1_gpc.parser import GPCParser
+from gs1_gpc.callbacks import GPCProcessedCallback
+
+SAMPLE_XML = os.path.join(os.path.dirname(__file__), 'data', 'sample_gpc.xml')
+
+
+class RecordingCallback(GPCProcessedCallback):
+    """Callback that records the bricks it was notified about."""
+
+    def __init__(self):
+        self.bricks = []
+        self.completed = None
+
+    def on_brick_processed(self, brick_code, brick_desc, class_code, is_new):
+        self.bricks.append((brick_code, class_code, is_new))
+
+    def on_processing_complete(self, counters):
+        self.completed = counters
+
+
+class TestGPCParser(unittest.TestCase):
+    """Test the GPCParser class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_db = tempfile.NamedTemporaryFile(suffix='.sqlite3', delete=False)
+        self.temp_db.close()
+        self.db_connection = DatabaseConnection(self.temp_db.name)
+        self.assertTrue(setup_database(self.db_connection))
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        self.db_connection.close()
+        for path in (self.temp_db.name, self.temp_db.name + '-wal', self.temp_db.name + '-shm'):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def _count(self, table):
+        conn, cursor = self.db_connection.connect()
+        cursor.execute(f"SELECT COUNT(*) FROM {table};")
+        return cursor.fetchone()[0]
+
+    def test_process_xml_counters(self):
+        """Test processed and inserted counters for the sample file."""
+        counters = GPCParser(self.db_connection).process_xml(SAMPLE_XML)
+        self.assertEqual(counters['segments_processed'], 2)
+        self.assertEqual(counters['segments_inserted'], 2)
+        self.assertEqual(counters['families_inserted'], 3)
+        self.assertEqual(counters['classes_inserted'], 3)
+        self.assertEqual(counters['bricks_processed'], 5)
+        self.assertEqual(counters['bricks_inserted'], 4)
+        self.assertEqual(counters['attribute_types_processed'], 3)
+        self.assertEqual(counters['attribute_types_inserted'], 2)
+        self.assertEqual(counters['attribute_values_processed'], 4)
+        self.assertEqual(counters['attribute_values_inserted'], 3)
+
+    def test_process_xml_rows(self):
+        """Test that the rows end up in the database."""
+        GPCParser(self.db_connection).process_xml(SAMPLE_XML)
+        self.assertEqual(self._count('gpc_segments'), 2)
+        self.assertEqual(self._count('gpc_families'), 3)
+        self.assertEqual(self._count('gpc_classes'), 3)
+        self.assertEqual(self._count('gpc_bricks'), 4)
+        self.assertEqual(self._count('gpc_attribute_types'), 2)
+        self.assertEqual(self._count('gpc_attribute_values'), 3)
+
+    def test_segment_filter(self):
+        """Test that only the requested segments are imported."""
+        counters = GPCParser(self.db_connection, segment_codes=['10000000']).process_xml(SAMPLE_XML)
+        self.assertEqual(counters['segments_processed'], 1)
+        self.assertEqual(counters['bricks_inserted'], 1)
+        self.assertEqual(self._count('gpc_families'), 1)
+        self.assertEqual(self._count('gpc_attribute_values'), 0)
+
+    def test_segment_filter_no_match(self):
+        """Test that filtered-out segments still count as found in the file."""
+        with self.assertLogs(level='INFO') as logs:
+            GPCParser(self.db_connection, segment_codes=['99999999']).process_xml(SAMPLE_XML)
+        self.assertFalse(any('No segment elements found' in line for line in logs.output))
+        self.assertTrue(any('excluded by the segment filter' in line for line in logs.output))
+        self.assertEqual(self._count('gpc_segments'), 0)
+    
+    def test_foreign_key_indexes(self):
+        """Test that the foreign key indexes exist after an import."""
+        GPCParser(self.db_connection).process_xml(SAMPLE_XML)
+        conn, cursor = self.db_connection.connect()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_gpc_%';")
+        self.assertEqual(len(cursor.fetchall()), 5)
+
+    def test_reimport_inserts_nothing_new(self):
+        """Test that importing the same file twice does not insert duplicates."""
+        GPCParser(self.db_connection).process_xml(SAMPLE_XML)
+        callback = RecordingCallback()
+        counters = GPCParser(self.db_connection, callback).process_xml(SAMPLE_XML)
+        self.assertEqual(counters['segments_inserted'], 0)
+        self.assertEqual(counters['attribute_values_inserted'], 0)
+        self.assertEqual(self._count('gpc_bricks'), 4)
+        self.assertEqual(len(callback.bricks), 4)
+        self.assertFalse(any(is_new for _, _, is_new in callback.bricks))
+        self.assertIs(callback.completed, counters)
+
+    def test_import_session_shares_connection(self):
+        """Test that several imports run on the connection opened by setup_database."""
+        conn = self.db_connection.conn
+        GPCParser(self.db_connection, segment_codes=['10000000']).process_xml(SAMPLE_XML)
+        counters = GPCParser(self.db_connection).process_xml(SAMPLE_XML)
+        self.assertIs(self.db_connection.conn, conn)
+        self.assertEqual(counters['segments_inserted'], 1)
+        self.assertEqual(self._count('gpc_segments'), 2)
+    
+    def test_reuse_after_failed_import(self):
+        """Test that a parser still imports after an earlier import was rolled back."""
+        with open(SAMPLE_XML, encoding='utf-8') as f:
+            content = f.read()
+        with tempfile.NamedTemporaryFile('w', suffix='.xml', delete=False) as f:
+            f.write(content[:content.rindex('</segment>')])
+        parser = GPCParser(self.db_connection)
+        try:
+            parser.process_xml(f.name)
+        finally:
+            os.unlink(f.name)
+        self.assertEqual(self._count('gpc_segments'), 0)
+        parser.process_xml(SAMPLE_XML)
+        self.assertEqual(self._count('gpc_segments'), 2)
+        self.assertEqual(self._count('gpc_attribute_values'), 3)
+    
+    def test_lock_released_after_import(self):
+        """Test that another connection can read while the importing one stays open."""
+        GPCParser(self.db_connection).process_xml(SAMPLE_XML)
+        other = sqlite3.connect(self.temp_db.name, timeout=0)
+        try:
+            count = other.execute("SELECT COUNT(*) FROM gpc_segments;").fetchone()[0]
+        finally:
+            other.close()
+        self.assertEqual(count, 2)
+    
+    def test_models_hierarchy(self):
+        """Test that the in-memory models mirror the XML hierarchy."""
+        parser = GPCParser(self.db_connection)
+        parser.process_xml(SAMPLE_XML)
+        brick = (parser.models.segments['50000000']
+                 .families['50100000'].classes['50101800'].bricks['10005959'])
+        self.assertEqual(brick.description, 'Apples - Prepared/Processed')
+        self.assertEqual(sorted(brick.attribute_types['20000123'].attribute_values),
+                         ['30000001', '30000002'])
+
+    def test_unexpected_root(self):
+        """Test that a file with the wrong root element is rejected."""
+        with tempfile.NamedTemporaryFile('w', suffix='.xml', delete=False) as f:
+            f.write('<catalog><segment code="1" text="x"/></catalog>')
+        try:
+            counters = GPCParser(self.db_connection).process_xml(f.name)
+        finally:
+            os.unlink(f.name)
+        self.assertEqual(counters['segments_processed'], 0)
+        self.assertEqual(self._count('gpc_segments'), 0)
+
+if __name__ == '__main__':
+    unittest.main()
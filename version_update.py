@@ -15,51 +15,79 @@ Usage:
 import re
 import sys
 import os
+import shutil
+
+# Accepted version format: X.Y.Z
+VERSION_RE = re.compile(r'^\d+\.\d+\.\d+$')
+
+# Version assignments in each file, compiled once
+INIT_VERSION_RE = re.compile(r"__version__ = '[^']+'")
+PYPROJECT_VERSION_RE = re.compile(r'version = "[^"]+"')
+SETUP_CFG_VERSION_RE = re.compile(r'version = \d+\.\d+\.\d+')
+SETUP_PY_VERSION_RE = re.compile(r'version="[^"]+"')
 
 
 def update_version(new_version):
     """Update version in all required files"""
     # Validate version format
-    if not re.match(r'^\d+\.\d+\.\d+$', new_version):
+    if not VERSION_RE.match(new_version):
         print(f"Error: Version '{new_version}' does not match format X.Y.Z")
         return False
 
-    # Update __init__.py
-    init_path = os.path.join('gs1_gpc', '__init__.py')
-    update_file(init_path, r"__version__ = '[^']+'", f"__version__ = '{new_version}'")
-
-    # Update pyproject.toml
-    update_file('pyproject.toml', r'version = "[^"]+"', f'version = "{new_version}"')
+    # (path, pattern, replacement, required) for every file carrying the version
+    targets = (
+        (os.path.join('gs1_gpc', '__init__.py'), INIT_VERSION_RE, f"__version__ = '{new_version}'", True),
+        ('pyproject.toml', PYPROJECT_VERSION_RE, f'version = "{new_version}"', True),
+        ('setup.cfg', SETUP_CFG_VERSION_RE, f'version = {new_version}', False),
+        ('setup.py', SETUP_PY_VERSION_RE, f'version="{new_version}"', False),
+    )
 
-    # Update setup.cfg if it exists
-    if os.path.exists('setup.cfg'):
-        update_file('setup.cfg', r'version = \d+\.\d+\.\d+', f'version = {new_version}')
-
-    # Update setup.py if it exists
-    if os.path.exists('setup.py'):
-        update_file('setup.py', r'version="[^"]+"', f'version="{new_version}"')
+    for file_path, pattern, replacement, required in targets:
+        update_file(file_path, pattern, replacement, required=required)
 
     print(f"Version updated to {new_version} in all files.")
     return True
 
 
-def update_file(file_path, pattern, replacement):
-    """Update version in a specific file"""
-    if not os.path.exists(file_path):
-        print(f"Warning: File {file_path} not found.")
-        return False
+def update_file(file_path, pattern, replacement, required=True):
+    """Update version in a specific file using a compiled pattern.
 
-    with open(file_path, 'r', encoding="utf-8") as file:
-        content = file.read()
+    A missing file is reported only if it is required.
+    """
+    try:
+        with open(file_path, 'r', encoding="utf-8") as file:
+            content = file.read()
+    except FileNotFoundError:
+        if required:
+            print(f"Warning: File {file_path} not found.")
+        return False
 
-    updated_content = re.sub(pattern, replacement, content)
+    # Each file declares its version once; leave any later matches alone
+    updated_content, count = pattern.subn(replacement, content, count=1)
 
-    if content == updated_content:
+    if not count:
         print(f"No version pattern found in {file_path}")
         return False
 
-    with open(file_path, 'w', encoding="utf-8") as file:
-        file.write(updated_content)
+    if updated_content == content:
+        print(f"{file_path} is already at the requested version")
+        return True
+
+    # Write a sibling file and rename it over the original, so an interrupted
+    # update never leaves a truncated file behind
+    temp_path = file_path + '.tmp'
+    try:
+        with open(temp_path, 'w', encoding="utf-8") as file:
+            file.write(updated_content)
+        shutil.copymode(file_path, temp_path)
+    except OSError:
+        # Do not leave a partial copy behind; it may not exist if open failed
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    os.replace(temp_path, file_path)
 
     print(f"Updated {file_path}")
     return True